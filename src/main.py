@@ -1,107 +1,109 @@
-import json
+import logging
 import os
 import asyncio
+import orjson
 from scraper import get_latest_jobs as get_microsoft_jobs
 from amazon_scraper import get_latest_jobs as get_amazon_jobs
-from emailer import send_email
+from emailer import close_smtp, send_email
+from paths import DATA_DIR
 
-# Ensure data directory exists
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+log = logging.getLogger("jobbot")
+
+# Known job IDs are stored as sorted JSON arrays rather than a database:
+# the scheduled workflow persists state between runs by committing these
+# files back to the repository, where text diffs stay small and reviewable.
 MICROSOFT_DATA_FILE = os.path.join(DATA_DIR, "known_jobs.json")
 AMAZON_DATA_FILE = os.path.join(DATA_DIR, "known_amazon_jobs.json")
 
-
-def ensure_data_dir():
-    """Ensure the data directory exists."""
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
-        print(f"Created data directory: {DATA_DIR}")
+# Placeholder IDs that must never be treated as a seen job
+_INVALID_IDS = frozenset({None, "", "unknown_id"})
 
 
 def load_known_jobs(filepath):
     """Load previously seen job IDs from a JSON file."""
-    ensure_data_dir()
     if os.path.exists(filepath):
-        with open(filepath, "r") as f:
+        with open(filepath, "rb") as f:
             try:
-                data = json.load(f)
+                data = orjson.loads(f.read())
                 if isinstance(data, list):
-                    valid_ids = [job_id for job_id in data if job_id and job_id != "unknown_id"]
-                    return set(valid_ids)
+                    return set(data) - _INVALID_IDS
                 return set()
-            except json.JSONDecodeError:
-                print(f"Warning: Could not parse {filepath}, starting fresh")
+            except orjson.JSONDecodeError:
+                log.warning("Could not parse %s, starting fresh", filepath)
                 return set()
     return set()
 
 
 def save_known_jobs(known_jobs, filepath):
     """Save known job IDs to a JSON file."""
-    ensure_data_dir()
-    with open(filepath, "w") as f:
-        json.dump(sorted(list(known_jobs)), f, indent=2)
-    print(f"Saved {len(known_jobs)} job IDs to {filepath}")
+    # Keep the indented layout: the workflow commits these files, so
+    # one ID per line keeps the git diffs readable.
+    # Write to a temp file and rename so a crash never leaves a truncated
+    # file. No fsync: lost IDs only mean a few duplicate alerts next run.
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(sorted(known_jobs), option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, filepath)
+    log.info("Saved %d job IDs to %s", len(known_jobs), filepath)
 
 
 async def check_source(source_name, scrape_fn, data_file):
     """
     Run the scrape → diff → return-new-jobs pipeline for one source.
-    Returns (new_jobs list, updated known_jobs set).
+    Returns (new_jobs list, updated known_jobs set); the caller persists the set.
     """
-    print(f"\n{'─' * 50}")
-    print(f"  {source_name}")
-    print(f"{'─' * 50}")
+    log.debug("─" * 50)
+    log.info("  %s", source_name)
+    log.debug("─" * 50)
 
     known_jobs = load_known_jobs(data_file)
-    print(f"Loaded {len(known_jobs)} previously seen {source_name} jobs.")
+    log.info("Loaded %d previously seen %s jobs.", len(known_jobs), source_name)
 
-    print(f"Scraping {source_name} Careers page...")
+    log.info("Scraping %s Careers page...", source_name)
     current_jobs = await scrape_fn()
 
     if not current_jobs:
-        print(f"\n❌ No {source_name} jobs found or scraping failed.")
+        log.error("❌ No %s jobs found or scraping failed.", source_name)
         return [], known_jobs
 
-    print(f"✓ Found {len(current_jobs)} {source_name} jobs on the page")
+    log.info("✓ Found %d %s jobs on the page", len(current_jobs), source_name)
 
+    current_ids = {job["id"] for job in current_jobs if job.get("id")}
+    new_ids = current_ids - known_jobs
+    known_jobs |= current_ids
+    # A posting listed twice on the page is only reported once, as first seen
     new_jobs = []
     for job in current_jobs:
         job_id = job.get("id")
-        if job_id and job_id not in known_jobs:
+        if job_id in new_ids:
             new_jobs.append(job)
-            known_jobs.add(job_id)
-            print(f"  NEW: {job.get('title', 'Unknown')[:50]}...")
-        else:
-            if job_id:
-                known_jobs.add(job_id)
+            new_ids.discard(job_id)
 
     if new_jobs:
-        print(f"\n🎉 {len(new_jobs)} NEW {source_name} job(s)!")
+        log.info("🎉 %d NEW %s job(s)!", len(new_jobs), source_name)
         for i, job in enumerate(new_jobs, 1):
-            print(f"  {i}. {job.get('title', 'Unknown Position')}")
-            print(f"     Location: {job.get('location', 'N/A')}")
-            print(f"     Link: {job.get('link', 'N/A')}")
+            log.info("  %d. %s", i, job.get("title", "Unknown Position"))
+            log.info("     Location: %s", job.get("location", "N/A"))
+            log.info("     Link: %s", job.get("link", "N/A"))
     else:
-        print(f"No new {source_name} jobs since last check.")
+        log.info("No new %s jobs since last check.", source_name)
 
-    # Always persist so newly validated IDs are saved
-    save_known_jobs(known_jobs, data_file)
     return new_jobs, known_jobs
 
 
 async def main():
-    print("=" * 50)
-    print("Job Alert Bot - Starting combined job check...")
-    print("  Sources: Microsoft + Amazon")
-    print("=" * 50)
+    log.debug("=" * 50)
+    log.info("Job Alert Bot - Starting combined job check...")
+    log.info("  Sources: Microsoft + Amazon")
+    log.debug("=" * 50)
 
     # --- Microsoft ---
-    ms_new, _ = await check_source(
+    ms_new, ms_known = await check_source(
         "Microsoft", get_microsoft_jobs, MICROSOFT_DATA_FILE
     )
 
     # --- Amazon ---
-    amz_new, _ = await check_source(
+    amz_new, amz_known = await check_source(
         "Amazon", get_amazon_jobs, AMAZON_DATA_FILE
     )
 
@@ -114,20 +116,46 @@ async def main():
         job["company"] = "Amazon"
         all_new.append(job)
 
+    # IDs are only ever added, and every added ID belongs to a new job, so a
+    # source with no new jobs has nothing to persist. The writes touch only
+    # local files, so run them in threads alongside the SMTP send.
+    saves = [
+        asyncio.to_thread(save_known_jobs, known, data_file)
+        for new, known, data_file in (
+            (ms_new, ms_known, MICROSOFT_DATA_FILE),
+            (amz_new, amz_known, AMAZON_DATA_FILE),
+        )
+        if new
+    ]
+
     if all_new:
-        print(f"\n📬 Sending single email with {len(all_new)} new job(s)...")
-        email_sent = send_email(all_new)
-        if email_sent:
-            print("✓ Email sent successfully!")
+        log.info("📬 Sending single email with %d new job(s)...", len(all_new))
+        email_sent, *save_results = await asyncio.gather(
+            send_email(all_new), *saves, return_exceptions=True
+        )
+        if isinstance(email_sent, Exception):
+            log.error("❌ Failed to send email: %s", email_sent)
+        elif email_sent:
+            log.info("✓ Email sent successfully!")
         else:
-            print("⚠ Email sending failed or skipped (check email configuration)")
+            log.warning("⚠ Email sending failed (check email configuration)")
     else:
-        print("\nNo new jobs from any source. No email sent.")
+        log.info("No new jobs from any source. No email sent.")
+        save_results = await asyncio.gather(*saves, return_exceptions=True)
 
-    print("\n" + "=" * 50)
-    print("Job check complete!")
-    print("=" * 50)
+    for result in save_results:
+        if isinstance(result, Exception):
+            log.error("❌ Failed to save known jobs: %s", result)
+
+    await close_smtp()
+
+    log.debug("=" * 50)
+    log.info("Job check complete!")
+    log.debug("=" * 50)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(message)s"
+    )
     asyncio.run(main())
@@ -0,0 +1,5 @@
+import os
+
+# Shared on-disk locations; the data directory is created once at import
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+os.makedirs(DATA_DIR, exist_ok=True)